@@ -10,152 +10,366 @@ Execution model:
 """
 
 import asyncio
-import traceback
+import inspect
+import logging
 from collections import deque
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
-import anyio
 import networkx as nx
 
-from core.graph_topology import get_downstream
 from core.spec_models import NodeSpec, TRIGGER_TYPES, OUTPUT_TYPES, LOGGER_TYPES, INTERFACE_TYPES, UI_COMPONENT_TYPES
 
+logger = logging.getLogger(__name__)
+
+# Node function kinds, classified once per executor
+ASYNC_GEN = 0   # async generator yielding (branch, value)
+COROUTINE = 1   # async function returning {branch: value}
+SYNC = 2        # plain function returning {branch: value}
+THREAD = 3      # plain function run in a worker thread (sync_mode="thread")
+
+# Worker tasks consuming the ready queue; None starts one task per ready
+# node, so fan-out (e.g. parallel LLM calls) is not capped
+DEFAULT_WORKERS = None
+
+# Plain-function nodes with at most this many outgoing edges run inline in
+# the scheduler instead of going through the worker queue
+INLINE_MAX_FANOUT = 8
+
+# Async generators that never await are given a scheduler turn this often
+YIELD_EVERY = 64
+
+
+class _Done:
+    """Awaitable that completes immediately without creating a coroutine."""
+    __slots__ = ()
+    
+    def __await__(self):
+        return iter(())
+
+
+_DONE = _Done()
+
+
+class _NodeState:
+    """Per-node tables and scheduling counters, reached with one dict lookup."""
+    __slots__ = (
+        "node_id", "func", "kind", "is_trigger", "is_source",
+        # Input metadata as parallel tuples, aligned by index
+        "input_names", "input_defaults", "input_has_default", "input_watchers", "queues",
+        "args",      # kwargs dict refilled on every firing
+        "running",   # firings in progress
+        "missing",   # inputs still lacking data (empty queue and no default)
+        "nonempty",  # constants only: downstream queues holding data
+    )
+
 
 class Executor:
-    def __init__(self, graph: nx.MultiDiGraph, observers: list = None, input_handler: Callable = None):
+    def __init__(self, graph: nx.DiGraph, observers: list = None, input_handler: Callable = None,
+                 workers: Optional[int] = DEFAULT_WORKERS):
         self.graph = graph
         self.observers = observers or []
         self.input_handler = input_handler
+        self.workers = workers
         self.input_queues: dict[tuple[str, str], deque] = {}
-        self.running: dict[str, int] = {}
+        self._dirty: set[str] = set()
+        # Observers receive batches: list of (event_type, data)
+        self._event_buffer: list[tuple[str, dict]] = []
+        self._flush_scheduled = False
         self._task_group = None
+        # Ready nodes get a task each, or with a worker count are consumed
+        # FIFO by that many workers
+        self._ready_queue: asyncio.Queue = None
+        self._pending = 0  # nodes queued or running
+        self._idle: asyncio.Event = None
+        self._scheduling = False
         self._stopped = False
+        # Trigger inputs read ahead from input_handler; None ends the stream
+        self._trigger_queue: asyncio.Queue = None
+        
+        # Static lookup tables - the graph does not change during a run
+        self._specs: dict[str, NodeSpec] = {node_id: graph.nodes[node_id]["spec"] for node_id in graph.nodes}
+        self._node_type: dict[str, str] = {}
+        self._nodes: dict[str, _NodeState] = {}
+        self._inline: set[str] = set()
+        self._trigger_nodes: frozenset[str] = frozenset()
+        self._interface_nodes: frozenset[str] = frozenset()
+        self._ui_nodes: frozenset[str] = frozenset()
+        self._output_nodes: frozenset[str] = frozenset()
+        self._logger_nodes: frozenset[str] = frozenset()
+        self._chat_ids: dict[str, Any] = {}
+        # Readiness checks run in topological order (insertion order if cyclic)
+        self._topo_index: dict[str, int] = {}
+        self._downstream: dict[tuple[str, str], tuple[tuple[str, str], ...]] = {}
+        # Same targets with their queue and watcher refs resolved, per run
+        self._routes: dict[tuple[str, str], tuple[tuple[str, str, _NodeState, deque, tuple[_NodeState, ...]], ...]] = {}
+        # Plain-Python adjacency so scheduling never walks NetworkX views
+        self._connected_inputs: set[tuple[str, str]] = set()
+        self._in_degree: dict[str, int] = {}
+        # Constant nodes (no incoming edges) refire once all their downstream
+        # queues are empty; per input, the constants feeding it (once per edge)
+        self._queue_watchers: dict[tuple[str, str], tuple[str, ...]] = {}
+        self._index_graph()
+    
+    def _index_graph(self):
+        """Precompute node types, input metadata and downstream targets per branch."""
+        downstream: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for u, v, data in self.graph.edges(data=True):
+            downstream.setdefault((u, data["src_branch"]), []).append((v, data["dst_input"]))
+            self._connected_inputs.add((v, data["dst_input"]))
+        self._downstream = {key: tuple(targets) for key, targets in downstream.items()}
+        self._in_degree = dict(self.graph.in_degree())
+        watchers: dict[tuple[str, str], list[str]] = {}
+        for u, v, data in self.graph.edges(data=True):
+            if self._in_degree[u] == 0:
+                watchers.setdefault((v, data["dst_input"]), []).append(u)
+        self._queue_watchers = {key: tuple(sources) for key, sources in watchers.items()}
+        
+        for node_id in self.graph.nodes:
+            spec = self._specs[node_id]
+            self._node_type[node_id] = spec.effective_type
+            state = _NodeState()
+            state.node_id = node_id
+            state.func = spec.func
+            if inspect.isasyncgenfunction(spec.func):
+                state.kind = ASYNC_GEN
+            elif inspect.iscoroutinefunction(spec.func):
+                state.kind = COROUTINE
+            elif spec.sync_mode == "thread":
+                state.kind = THREAD
+            else:
+                state.kind = SYNC
+            state.is_source = self._in_degree[node_id] == 0
+            state.input_names = tuple(spec.inputs)
+            state.input_defaults = tuple(d.default for d in spec.inputs.values())
+            # Only unconnected inputs may fall back to their default
+            state.input_has_default = tuple(
+                d.default is not None and not self._has_incoming_edge(node_id, name)
+                for name, d in spec.inputs.items()
+            )
+            state.queues = ()
+            state.args = dict.fromkeys(state.input_names)
+            state.running = state.missing = state.nonempty = 0
+            self._nodes[node_id] = state
         
+        order = nx.topological_sort(self.graph) if nx.is_directed_acyclic_graph(self.graph) else self.graph.nodes
+        self._topo_index = {node_id: i for i, node_id in enumerate(order)}
+        # Constants stay out: they refire whenever downstream drains, and
+        # inline that would loop in the scheduler without yielding
+        self._inline = {
+            node_id for node_id, state in self._nodes.items()
+            if state.kind == SYNC and not state.is_source
+            and self.graph.out_degree(node_id) <= INLINE_MAX_FANOUT
+        }
+        node_types = self._node_type.items()
+        self._trigger_nodes = frozenset(n for n, t in node_types if t in TRIGGER_TYPES)
+        self._interface_nodes = frozenset(n for n, t in node_types if t in INTERFACE_TYPES)
+        self._ui_nodes = frozenset(n for n, t in node_types if t in UI_COMPONENT_TYPES)
+        self._output_nodes = frozenset(n for n, t in node_types if t in OUTPUT_TYPES)
+        self._logger_nodes = frozenset(n for n, t in node_types if t in LOGGER_TYPES)
+        for node_id, state in self._nodes.items():
+            state.is_trigger = node_id in self._trigger_nodes
+            state.input_watchers = tuple(self._watcher_states(node_id, name) for name in state.input_names)
+        for node_id in self._interface_nodes:
+            chat_id = self._specs[node_id].inputs.get("chat_id")
+            self._chat_ids[node_id] = chat_id.default if chat_id is not None else "default"
+        
+    def _watcher_states(self, node_id: str, input_name: str) -> tuple[_NodeState, ...]:
+        """States of the constant nodes feeding an input, once per edge."""
+        return tuple(self._nodes[source] for source in self._queue_watchers.get((node_id, input_name), ()))
+    
     def _init_queues(self):
         """Initialize input queues for all nodes."""
-        for node_id in self.graph.nodes:
-            spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-            self.running[node_id] = 0
-            for input_name in spec.inputs:
-                self.input_queues[(node_id, input_name)] = deque()
+        for node_id, state in self._nodes.items():
+            state.running = 0
+            queues = []
+            for input_name in state.input_names:
+                queue = deque()
+                self.input_queues[(node_id, input_name)] = queue
+                queues.append(queue)
+            state.queues = tuple(queues)
+            state.missing = state.input_has_default.count(False)
+            state.nonempty = 0
+        self._routes = {
+            key: tuple(
+                (node_id, input_name, self._nodes[node_id], self.input_queues[(node_id, input_name)],
+                 self._watcher_states(node_id, input_name))
+                for node_id, input_name in targets
+            )
+            for key, targets in self._downstream.items()
+        }
+        # Every node needs one readiness check at start
+        self._dirty = set(self.graph.nodes)
     
     def _inject_inits(self):
         """Inject initial values for inputs with init defined."""
         for node_id in self.graph.nodes:
-            spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-            node_type = self._get_node_type(node_id)
-            if node_type in TRIGGER_TYPES:
+            spec = self._specs[node_id]
+            if node_id in self._trigger_nodes:
                 continue
-            for input_name, input_def in spec.inputs.items():
+            state = self._nodes[node_id]
+            for i, input_def in enumerate(spec.inputs.values()):
                 if input_def.init is not None:
-                    self.input_queues[(node_id, input_name)].append(input_def.init)
-    
-    def _get_node_type(self, node_id: str) -> str:
-        spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-        return spec.node_type or spec.func.__name__
+                    queue = state.queues[i]
+                    if not queue:
+                        if not state.input_has_default[i]:
+                            state.missing -= 1
+                        for source in state.input_watchers[i]:
+                            source.nonempty += 1
+                    queue.append(input_def.init)
     
     def _is_trigger(self, node_id: str) -> bool:
         """Check if node is a trigger (entry point)."""
-        return self._get_node_type(node_id) in TRIGGER_TYPES
+        return node_id in self._trigger_nodes
     
     def _is_interface(self, node_id: str) -> bool:
         """Check if node is an interface (has UI)."""
-        return self._get_node_type(node_id) in INTERFACE_TYPES
+        return node_id in self._interface_nodes
     
     def _is_ui_component(self, node_id: str) -> bool:
         """Check if node is a UI component (renders on App canvas)."""
-        return self._get_node_type(node_id) in UI_COMPONENT_TYPES
+        return node_id in self._ui_nodes
     
     def _has_incoming_edge(self, node_id: str, input_name: str) -> bool:
         """Check if an input has an incoming edge (is connected)."""
-        for u, v, data in self.graph.in_edges(node_id, data=True):
-            if data.get("dst_input") == input_name:
-                return True
-        return False
-    
-    def _all_inputs_ready(self, node_id: str) -> bool:
-        """
-        Check if all required inputs have data available.
-        
-        Rules:
-        - Connected inputs MUST have queued data
-        - Unconnected inputs can use defaults
-        """
-        spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-        
-        for input_name, input_def in spec.inputs.items():
-            queue = self.input_queues[(node_id, input_name)]
-            has_queued = len(queue) > 0
-            is_connected = self._has_incoming_edge(node_id, input_name)
-            has_default = input_def.default is not None
-            
-            if is_connected:
-                if not has_queued:
-                    return False
-            else:
-                if not has_queued and not has_default:
-                    return False
-        
-        return True
-    
-    def _has_any_incoming_edge(self, node_id: str) -> bool:
-        """Check if node has any incoming edges."""
-        return self.graph.in_degree(node_id) > 0
-    
-    def _downstream_queues_empty(self, node_id: str) -> bool:
-        """Check if all downstream queues from this node are empty."""
-        for _, target_node, data in self.graph.out_edges(node_id, data=True):
-            target_input = data.get("dst_input")
-            if target_input:
-                queue = self.input_queues.get((target_node, target_input))
-                if queue and len(queue) > 0:
-                    return False  # Queue has data, don't fire yet
-        return True  # All downstream queues are empty
+        return (node_id, input_name) in self._connected_inputs
     
     def _is_ready(self, node_id: str) -> bool:
         """Check if a node is ready to fire."""
-        if self.running[node_id] > 0:
+        state = self._nodes[node_id]
+        if state.running > 0:
             return False
         
-        if self._is_trigger(node_id):
+        if state.is_trigger:
             return False
         
         # Nodes with no incoming edges (constants) fire when downstream queues are empty
-        if not self._has_any_incoming_edge(node_id):
-            if not self._downstream_queues_empty(node_id):
-                return False
+        if state.is_source and state.nonempty:
+            return False
         
-        return self._all_inputs_ready(node_id)
+        # Connected inputs must have queued data; unconnected ones may use
+        # defaults. Tracked incrementally as queues fill and drain.
+        return state.missing == 0
     
     def _get_ready_nodes(self) -> list[str]:
-        """Get all nodes ready to fire."""
-        return [n for n in self.graph.nodes if self._is_ready(n)]
+        """
+        Get dirty nodes ready to fire.
+        
+        Only nodes whose state changed since the last check are re-evaluated,
+        upstream first; the dirty set is drained in the process.
+        """
+        dirty = sorted(self._dirty, key=self._topo_index.__getitem__)
+        self._dirty.clear()
+        return [node_id for node_id in dirty if self._is_ready(node_id)]
     
     def _pop_inputs(self, node_id: str) -> dict[str, Any]:
-        """Pop one value from each input queue."""
-        spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-        args = {}
-        for input_name, input_def in spec.inputs.items():
-            queue = self.input_queues[(node_id, input_name)]
-            if len(queue) > 0:
-                args[input_name] = queue.popleft()
+        """
+        Pop one value from each input queue.
+        
+        The returned dict is the node's own and is overwritten on its next
+        firing; calls splat it with **, which copies.
+        """
+        state = self._nodes[node_id]
+        args = state.args
+        missing = 0
+        for name, default, has_default, watchers, queue in zip(
+            state.input_names,
+            state.input_defaults,
+            state.input_has_default,
+            state.input_watchers,
+            state.queues,
+        ):
+            if queue:
+                args[name] = queue.popleft()
+                if queue:
+                    continue
+                # Drained a queue: feeding constants may be free to refire
+                for source in watchers:
+                    source.nonempty -= 1
+                    if source.nonempty == 0:
+                        self._dirty.add(source.node_id)
             else:
-                args[input_name] = input_def.default
+                args[name] = default
+            if not has_default:
+                missing += 1
+        state.missing = missing
         return args
     
-    async def _notify(self, event_type: str, data: dict):
-        """Notify all observers of an event."""
-        for observer in self.observers:
-            await observer(event_type, data)
+    def _queue_event(self, event_type: str, data: dict):
+        """
+        Buffer an event for observers.
+        
+        Events are delivered as one batch per scheduler tick by a flush task.
+        """
+        if not self.observers:
+            return
+        self._event_buffer.append((event_type, data))
+        self._schedule_flush()
+    
+    def _queue_events(self, events: list[tuple[str, dict]]):
+        """Buffer several events for observers at once."""
+        self._event_buffer.extend(events)
+        self._schedule_flush()
     
-    async def _route_output(self, node_id: str, branch: str, value: Any):
+    def _schedule_flush(self):
+        """Start a flush task for the buffered events unless one is pending."""
+        if self._task_group is not None and not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._task_group.create_task(self._flush_events())
+    
+    def _notify(self, event_type: str, data: dict):
+        """
+        Queue an event for observers and return an awaitable.
+        
+        Outside the task group (no scheduler yet) the awaitable delivers the
+        events directly. With no observers nothing is allocated.
+        """
+        if not self.observers:
+            return _DONE
+        self._queue_event(event_type, data)
+        if self._task_group is None:
+            return self._flush_events()
+        return _DONE
+    
+    async def _flush_events(self):
+        """Deliver all buffered events to observers as one batch."""
+        # Yield once so events produced in the same tick join the batch
+        await asyncio.sleep(0)
+        self._flush_scheduled = False
+        events, self._event_buffer = self._event_buffer, []
+        if not events:
+            return
+        observers = self.observers
+        if len(observers) == 1:
+            try:
+                await observers[0](events)
+            except Exception:
+                # A failing observer must not tear down the run's task group
+                logger.exception("Observer failed")
+            return
+        # Observers are independent - don't let a slow one hold up the rest
+        results = await asyncio.gather(*(observer(events) for observer in observers), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Observer failed", exc_info=result)
+    
+    def _route_output(self, node_id: str, branch: str, value: Any):
         """Route output to downstream nodes' input queues."""
-        for target_node, target_input in get_downstream(self.graph, node_id, branch):
-            self.input_queues[(target_node, target_input)].append(value)
+        dirty = self._dirty
+        for target_node, target_input, target, queue, watchers in self._routes.get((node_id, branch), ()):
+            # Connected inputs never fall back to defaults, so an empty ->
+            # non-empty transition fills a missing input; the last one
+            # makes the target a candidate for firing
+            if not queue:
+                target.missing -= 1
+                if target.missing == 0:
+                    dirty.add(target_node)
+                for source in watchers:
+                    source.nonempty += 1
+            queue.append(value)
             
             # If target is a UI component, notify UI to display the data
             if self._is_ui_component(target_node):
-                await self._notify("ui_update", {
+                self._queue_event("ui_update", {
                     "node_id": target_node,
                     "input": target_input,
                     "value": value
@@ -163,60 +377,160 @@ class Executor:
             
             # Legacy interface handling
             elif self._is_interface(target_node):
-                spec: NodeSpec = self.graph.nodes[target_node]["spec"]
-                chat_id = spec.inputs.get("chat_id", {})
-                chat_id_value = chat_id.default if hasattr(chat_id, 'default') else "default"
-                await self._notify("interface_display", {
+                self._queue_event("interface_display", {
                     "node_id": target_node,
-                    "chat_id": chat_id_value,
+                    "chat_id": self._chat_ids[target_node],
                     "input": target_input,
                     "value": value
                 })
     
+    async def _execute(self, node_id: str, args: dict[str, Any]):
+        """
+        Call the node func and handle each output it produces.
+        
+        Async generators yield (branch, value) tuples. Plain and async
+        functions return a {branch: value} dict; None values are not emitted.
+        """
+        # Bind once - the output loop may run many times per firing
+        handle = self._handle_output
+        state = self._nodes[node_id]
+        func = state.func
+        kind = state.kind
+        
+        if kind == ASYNC_GEN:
+            count = 0
+            async for branch, value in func(**args):
+                handle(node_id, branch, value)
+                count += 1
+                if count % YIELD_EVERY == 0:
+                    # Let workers and the event flush run between bursts
+                    await asyncio.sleep(0)
+            return
+        
+        if kind == COROUTINE:
+            self._emit_result(node_id, await func(**args))
+        elif kind == THREAD:
+            self._emit_result(node_id, await asyncio.to_thread(func, **args))
+        else:
+            self._emit_result(node_id, func(**args))
+    
+    def _emit_result(self, node_id: str, result: dict[str, Any] | None):
+        """Handle each non-None value of a {branch: value} result."""
+        if not result:
+            return
+        handle = self._handle_output
+        for branch, value in result.items():
+            if value is not None:
+                handle(node_id, branch, value)
+    
     async def _run_node(self, node_id: str):
         """Execute a single node."""
         # running counter was already incremented by _schedule_ready
-        spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-        node_type = self._get_node_type(node_id)
+        node_type = self._node_type[node_id]
         args = self._pop_inputs(node_id)
         
         await self._notify("node_start", {"node_id": node_id, "node_type": node_type})
         
         try:
-            async for branch, value in spec.func(**args):
-                await self._handle_output(node_id, node_type, branch, value)
+            await self._execute(node_id, args)
         except Exception as e:
-            tb = traceback.format_exc()
-            print(f"[ERROR] Node {node_id}: {e}\n{tb}")
+            logger.exception("Node %s failed", node_id)
             await self._notify("node_error", {"node_id": node_id, "error": str(e)})
         finally:
-            self.running[node_id] -= 1
+            state = self._nodes[node_id]
+            state.running -= 1
+            # The node may have more queued inputs waiting for it
+            if state.missing == 0:
+                self._dirty.add(node_id)
             await self._notify("node_done", {"node_id": node_id})
             self._schedule_ready()
     
-    async def _handle_output(self, node_id: str, node_type: str, branch: str, value: Any):
-        """Handle node output - notify and route downstream."""
-        if node_type in OUTPUT_TYPES:
-            await self._notify("terminal_output", {"node_id": node_id, "value": value})
+    def _run_inline(self, node_id: str):
+        """Execute a plain-function node synchronously, without a worker."""
+        # running counter was already incremented by _schedule_ready
+        node_type = self._node_type[node_id]
+        args = self._pop_inputs(node_id)
         
-        if node_type in LOGGER_TYPES:
-            await self._notify("log", {"node_id": node_id, "value": value})
+        self._queue_event("node_start", {"node_id": node_id, "node_type": node_type})
         
-        await self._notify("node_output", {"node_id": node_id, "branch": branch, "value": value})
-        await self._route_output(node_id, branch, value)
-        self._schedule_ready()
+        try:
+            self._emit_result(node_id, self._nodes[node_id].func(**args))
+        except Exception as e:
+            logger.exception("Node %s failed", node_id)
+            self._queue_event("node_error", {"node_id": node_id, "error": str(e)})
+        finally:
+            state = self._nodes[node_id]
+            state.running -= 1
+            if state.missing == 0:
+                self._dirty.add(node_id)
+            self._queue_event("node_done", {"node_id": node_id})
+    
+    def _handle_output(self, node_id: str, branch: str, value: Any):
+        """Handle node output - notify and route downstream."""
+        if self.observers:
+            events = []
+            if node_id in self._output_nodes:
+                events.append(("terminal_output", {"node_id": node_id, "value": value}))
+            
+            if node_id in self._logger_nodes:
+                events.append(("log", {"node_id": node_id, "value": value}))
+            
+            events.append(("node_output", {"node_id": node_id, "branch": branch, "value": value}))
+            self._queue_events(events)
+        self._route_output(node_id, branch, value)
+        if self._dirty:
+            self._schedule_ready()
     
     def _schedule_ready(self):
-        """Schedule all ready nodes for execution."""
-        if self._task_group is None or self._stopped:
+        """
+        Start all ready nodes.
+        
+        Plain-function nodes run inline; the rest go onto the worker queue.
+        Inline runs can make more nodes ready, so loop until none are left.
+        Nested calls from inline runs return at once and are picked up here.
+        """
+        if self._task_group is None or self._stopped or self._scheduling:
             return
-        ready = self._get_ready_nodes()
-        if ready:
-            print(f"[DEBUG] Scheduling nodes: {ready}")
-        for node_id in ready:
-            # Increment running BEFORE starting the task to prevent double-scheduling
-            self.running[node_id] += 1
-            self._task_group.start_soon(self._run_node, node_id)
+        self._scheduling = True
+        try:
+            while self._dirty and not self._stopped:
+                ready = self._get_ready_nodes()
+                if ready and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Scheduling nodes: %s", ready)
+                for node_id in ready:
+                    # Increment running BEFORE queueing to prevent double-scheduling
+                    self._nodes[node_id].running += 1
+                    if node_id in self._inline:
+                        self._run_inline(node_id)
+                        continue
+                    self._pending += 1
+                    self._idle.clear()
+                    if self.workers is None:
+                        self._task_group.create_task(self._run_queued(node_id))
+                    else:
+                        self._ready_queue.put_nowait(node_id)
+        finally:
+            self._scheduling = False
+    
+    async def _run_queued(self, node_id: str):
+        """Run a scheduled node and mark the executor idle when none are left."""
+        try:
+            await self._run_node(node_id)
+        finally:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.set()
+    
+    async def _worker(self):
+        """Run ready nodes from the queue until a None sentinel arrives."""
+        while True:
+            node_id = await self._ready_queue.get()
+            if node_id is None:
+                return
+            await self._run_queued(node_id)
+            # Queue.get() doesn't suspend while items are queued; without this
+            # a constant that refires forever would never give the loop a turn
+            await asyncio.sleep(0)
     
     async def fire_trigger(self, node_id: str, value: Any):
         """
@@ -229,23 +543,31 @@ class Executor:
         if self._stopped:
             return
         
-        spec: NodeSpec = self.graph.nodes[node_id]["spec"]
-        node_type = self._get_node_type(node_id)
+        node_type = self._node_type[node_id]
         
-        self.running[node_id] += 1
+        state = self._nodes[node_id]
+        state.running += 1
         await self._notify("node_start", {"node_id": node_id, "node_type": node_type})
         
         try:
-            async for branch, out_value in spec.func(value=value):
-                await self._handle_output(node_id, node_type, branch, out_value)
+            await self._execute(node_id, {"value": value})
         except Exception as e:
-            tb = traceback.format_exc()
-            print(f"[ERROR] Trigger {node_id}: {e}\n{tb}")
+            logger.exception("Trigger %s failed", node_id)
             await self._notify("node_error", {"node_id": node_id, "error": str(e)})
         finally:
-            self.running[node_id] -= 1
+            state.running -= 1
             await self._notify("node_done", {"node_id": node_id})
     
+    async def _pump_inputs(self):
+        """Read trigger inputs into the trigger queue while earlier ones fire."""
+        try:
+            while not self._stopped:
+                trigger_id, value = await self.input_handler()
+                if trigger_id and value is not None:
+                    self._trigger_queue.put_nowait((trigger_id, value))
+        finally:
+            self._trigger_queue.put_nowait(None)
+    
     def get_triggers(self) -> list[str]:
         """Get all trigger node IDs in the graph."""
         return [n for n in self.graph.nodes if self._is_trigger(n)]
@@ -266,7 +588,7 @@ class Executor:
         # Notify frontend about available triggers
         triggers = self.get_triggers()
         for trigger_id in triggers:
-            node_type = self._get_node_type(trigger_id)
+            node_type = self._node_type[trigger_id]
             
             # UI component triggers
             if node_type in UI_COMPONENT_TYPES:
@@ -277,7 +599,7 @@ class Executor:
             
             # Legacy interface nodes
             elif node_type in INTERFACE_TYPES:
-                spec: NodeSpec = self.graph.nodes[trigger_id]["spec"]
+                spec = self._specs[trigger_id]
                 participants = []
                 for p in spec.participants:
                     participants.append({
@@ -286,12 +608,9 @@ class Executor:
                         "can_send": p.can_send,
                         "can_receive": p.can_receive
                     })
-                # Get chat_id from defaults
-                chat_id = spec.inputs.get("chat_id", {})
-                chat_id_value = chat_id.default if hasattr(chat_id, 'default') else "default"
                 await self._notify("interface_available", {
                     "node_id": trigger_id,
-                    "chat_id": chat_id_value,
+                    "chat_id": self._chat_ids[trigger_id],
                     "interface_type": spec.interface_type,
                     "participants": participants,
                     "inputs": list(spec.inputs.keys()),
@@ -306,17 +625,29 @@ class Executor:
                     "trigger_type": "terminal"
                 })
         
-        async with anyio.create_task_group() as tg:
+        self._ready_queue = asyncio.Queue()
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        
+        async with asyncio.TaskGroup() as tg:
             self._task_group = tg
+            for _ in range(self.workers or 0):
+                tg.create_task(self._worker())
             self._schedule_ready()
             
             # Keep alive waiting for trigger inputs via websocket
             if triggers and self.input_handler:
-                while not self._stopped:
-                    # Wait for any trigger input
-                    trigger_id, value = await self.input_handler()
-                    if trigger_id and value is not None:
-                        await self.fire_trigger(trigger_id, value)
+                self._trigger_queue = asyncio.Queue()
+                tg.create_task(self._pump_inputs())
+                # Fire in arrival order; the pump keeps reading meanwhile
+                while (item := await self._trigger_queue.get()) is not None:
+                    await self.fire_trigger(*item)
+            
+            # Let queued nodes finish, then release the workers
+            await self._idle.wait()
+            for _ in range(self.workers or 0):
+                self._ready_queue.put_nowait(None)
     
     def stop(self):
         """Stop the executor."""
@@ -37,6 +37,17 @@ def export_graph(instances: list[dict], edges: list[dict], node_types: dict) ->
             dst_handle=edge["targetHandle"]
         )
     
+    # Index edges once instead of walking the graph per node / input
+    out_edges_by_node: dict[str, list[tuple[str, dict]]] = {node_id: [] for node_id in g.nodes}
+    for source, target, data in g.edges(data=True):
+        out_edges_by_node[source].append((target, data))
+    # Sources in predecessor order (as g.in_edges gives them), which decides
+    # the variable picked when an input has several sources
+    sources_by_input: dict[tuple[str, str], list[tuple[str, str]]] = {}
+    for target in g.nodes:
+        for source, _, data in g.in_edges(target, data=True):
+            sources_by_input.setdefault((target, data["dst_handle"]), []).append((source, data["src_handle"]))
+    
     # Find triggers and outputs
     triggers = []
     outputs = []
@@ -61,18 +72,20 @@ def export_graph(instances: list[dict], edges: list[dict], node_types: dict) ->
         if node_type not in TRIGGER_TYPES and node_type not in OUTPUT_TYPES and node_type != "logger":
             functions_used.add(node_type)
     
+    # Input definitions per node type, looked up once
+    type_inputs = {name: info.get("inputs", {}) for name, info in node_types.items()}
+    
     # Determine trigger types
     trigger_specs = []
     for node_id in triggers:
         type_name = "Any"
-        for _, target, data in g.out_edges(node_id, data=True):
-            target_type = g.nodes[target]["type"]
-            if target_type in node_types:
-                target_handle = data["dst_handle"]
-                if target_handle in node_types[target_type].get("inputs", {}):
-                    type_name = node_types[target_type]["inputs"][target_handle].get("type", "Any")
-                    break
+        for target, data in out_edges_by_node[node_id]:
+            target_inputs = type_inputs.get(g.nodes[target]["type"])
+            if target_inputs is not None and data["dst_handle"] in target_inputs:
+                type_name = target_inputs[data["dst_handle"]].get("type", "Any")
+                break
         trigger_specs.append({"id": node_id, "type": type_name})
+    trigger_type_hints = {spec["id"]: spec["type"] for spec in trigger_specs}
     
     # Generate code
     lines = []
@@ -103,30 +116,27 @@ def export_graph(instances: list[dict], edges: list[dict], node_types: dict) ->
     
     # Track variable names for each node's output
     var_map = {}
+    var_names = {node_id: _make_var_name(node_id) for node_id in sorted_nodes}
     
     for node_id in sorted_nodes:
         node_type = g.nodes[node_id]["type"]
-        var_name = _make_var_name(node_id)
+        var_name = var_names[node_id]
         
         if node_type in TRIGGER_TYPES:
             # Get input from trigger (via IO adapter)
             trigger_name = node_id.replace("-", "_")
-            type_hint = "int"
-            for spec in trigger_specs:
-                if spec["id"] == node_id:
-                    type_hint = spec["type"]
-                    break
+            type_hint = trigger_type_hints.get(node_id, "int")
             lines.append(f'    {var_name} = await io.input("{trigger_name}", {type_hint})')
             var_map[node_id] = var_name
             
         elif node_type in OUTPUT_TYPES:
             # Send output via IO adapter
             output_name = node_id.replace("-", "_")
-            input_var = _get_input_var(g, node_id, "value", var_map)
+            input_var = _get_input_var(sources_by_input, node_id, "value", var_map)
             lines.append(f'    await io.output("{output_name}", {input_var})')
             
         elif node_type == "logger":
-            input_var = _get_input_var(g, node_id, "msg", var_map)
+            input_var = _get_input_var(sources_by_input, node_id, "msg", var_map)
             lines.append(f'    print(f"[LOG] {{{input_var}}}")')
             
         else:
@@ -136,14 +146,13 @@ def export_graph(instances: list[dict], edges: list[dict], node_types: dict) ->
             
             # Get input arguments
             args = []
-            if node_type in node_types:
-                for input_name in node_types[node_type].get("inputs", {}):
-                    input_var = _get_input_var(g, node_id, input_name, var_map)
+            if node_type in type_inputs:
+                for input_name in type_inputs[node_type]:
+                    input_var = _get_input_var(sources_by_input, node_id, input_name, var_map)
                     args.append(f'{input_name}={input_var}')
             
             # Check if it's a branching node
-            out_edges = list(g.out_edges(node_id, data=True))
-            output_handles = set(e[2]["src_handle"] for e in out_edges)
+            output_handles = {data["src_handle"] for _, data in out_edges_by_node[node_id]}
             
             if len(output_handles) > 1:
                 # Branching node
@@ -179,16 +188,14 @@ def _make_var_name(node_id: str) -> str:
     return node_id.replace("-", "_").replace(" ", "_")
 
 
-def _get_input_var(g: nx.DiGraph, node_id: str, input_name: str, var_map: dict) -> str:
+def _get_input_var(sources_by_input: dict, node_id: str, input_name: str, var_map: dict) -> str:
     """Get the variable name that provides input to this node."""
-    for source, target, data in g.in_edges(node_id, data=True):
-        if data["dst_handle"] == input_name:
-            src_handle = data["src_handle"]
-            key_with_handle = f"{source}:{src_handle}"
-            if key_with_handle in var_map:
-                return var_map[key_with_handle]
-            elif source in var_map:
-                return var_map[source]
+    for source, src_handle in sources_by_input.get((node_id, input_name), ()):
+        key_with_handle = f"{source}:{src_handle}"
+        if key_with_handle in var_map:
+            return var_map[key_with_handle]
+        elif source in var_map:
+            return var_map[source]
     return "None  # No input connected"
 
 
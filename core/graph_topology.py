@@ -2,9 +2,14 @@ from typing import Any
 import networkx as nx
 from core.spec_models import NodeSpec, EdgeSpec, TRIGGER_TYPES
 
+_EMPTY: dict = {}
+_NO_ENTRIES: frozenset = frozenset()
 
-def build_graph(nodes: list[NodeSpec], edges: list[EdgeSpec]) -> nx.MultiDiGraph:
-    g = nx.MultiDiGraph()
+
+def build_graph(nodes: list[NodeSpec], edges: list[EdgeSpec]) -> nx.DiGraph:
+    # Only pay for a multigraph when two edges join the same pair of nodes
+    pairs = {(edge.source_node, edge.target_node) for edge in edges}
+    g = nx.DiGraph() if len(pairs) == len(edges) else nx.MultiDiGraph()
     
     for node in nodes:
         g.add_node(node.name, spec=node)
@@ -17,21 +22,143 @@ def build_graph(nodes: list[NodeSpec], edges: list[EdgeSpec]) -> nx.MultiDiGraph
             dst_input=edge.target_input
         )
     
+    _index_edges(g)
     return g
 
 
-def validate_graph(g: nx.MultiDiGraph, entry_bindings: dict[tuple[str, str], any] = None) -> list[str]:
+def _index_edges(g: nx.DiGraph) -> dict:
+    """
+    Build plain-dict adjacency for the graph and cache it on g.graph.
+    
+    - edges: [(u, v, src_branch, dst_input), ...]
+    - in_adj: node -> [(u, src_branch, dst_input), ...]
+    - out_adj_by_branch: node -> branch -> ((v, dst_input), ...)
+    - nodes / succ: node ids by integer index, and successor indices per index
+    """
+    nodes = list(g.nodes)
+    position = {node_id: i for i, node_id in enumerate(nodes)}
+    succ = [[] for _ in nodes]
+    edges = []
+    in_adj = {node_id: [] for node_id in g.nodes}
+    out_adj_by_branch = {node_id: {} for node_id in g.nodes}
+    for u, v, data in g.edges(data=True):
+        src_branch = data["src_branch"]
+        dst_input = data["dst_input"]
+        edges.append((u, v, src_branch, dst_input))
+        in_adj[v].append((u, src_branch, dst_input))
+        out_adj_by_branch[u].setdefault(src_branch, []).append((v, dst_input))
+        succ[position[u]].append(position[v])
+    # Freeze downstream lists so lookups can hand them out without copying
+    for branches in out_adj_by_branch.values():
+        for branch, targets in branches.items():
+            branches[branch] = tuple(targets)
+    index = {
+        "edges": edges,
+        "in_adj": in_adj,
+        "out_adj_by_branch": out_adj_by_branch,
+        "nodes": nodes,
+        "succ": succ,
+    }
+    g.graph.update(index)
+    return index
+
+
+def _edge_index(g: nx.DiGraph) -> dict:
+    """Return the cached adjacency, building it for graphs not made by build_graph."""
+    if "in_adj" not in g.graph:
+        return _index_edges(g)
+    return g.graph
+
+
+def _is_acyclic(succ: list[list[int]]) -> bool:
+    """Kahn's algorithm: True if every node drains when sources are peeled off."""
+    indegree = [0] * len(succ)
+    for successors in succ:
+        for w in successors:
+            indegree[w] += 1
+    ready = [v for v, d in enumerate(indegree) if d == 0]
+    drained = 0
+    while ready:
+        v = ready.pop()
+        drained += 1
+        for w in succ[v]:
+            indegree[w] -= 1
+            if indegree[w] == 0:
+                ready.append(w)
+    return drained == len(succ)
+
+
+def _cycles(succ: list[list[int]]):
+    """
+    Yield strongly connected components with more than one node.
+    
+    Iterative Tarjan over integer adjacency; singletons are dropped as
+    they are found instead of being collected.
+    """
+    count = len(succ)
+    preorder = [-1] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    stack = []
+    counter = 0
+    for root in range(count):
+        if preorder[root] != -1:
+            continue
+        preorder[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            v, i = work[-1]
+            successors = succ[v]
+            if i < len(successors):
+                work[-1] = (v, i + 1)
+                w = successors[i]
+                if preorder[w] == -1:
+                    preorder[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w] and preorder[w] < lowlink[v]:
+                    lowlink[v] = preorder[w]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if lowlink[v] < lowlink[parent]:
+                    lowlink[parent] = lowlink[v]
+            if lowlink[v] != preorder[v]:
+                continue
+            w = stack.pop()
+            on_stack[w] = False
+            if w == v:
+                continue
+            component = [w]
+            while w != v:
+                w = stack.pop()
+                on_stack[w] = False
+                component.append(w)
+            yield component
+
+
+def validate_graph(g: nx.DiGraph, entry_bindings: dict[tuple[str, str], any] = None) -> list[str]:
     """Validate the graph and return list of errors (empty if valid)."""
     errors = []
     entry_bindings = entry_bindings or {}
+    # Bound input names per node, so checks don't build (node, input) keys
+    entries_by_node: dict[str, set[str]] = {}
+    for node_id, input_name in entry_bindings:
+        entries_by_node.setdefault(node_id, set()).add(input_name)
+    
+    index = _edge_index(g)
+    specs: dict[str, NodeSpec] = dict(g.nodes(data="spec"))
     
     # Check type matching on edges
-    for u, v, data in g.edges(data=True):
-        src_spec: NodeSpec = g.nodes[u]["spec"]
-        dst_spec: NodeSpec = g.nodes[v]["spec"]
-        
-        src_branch = data["src_branch"]
-        dst_input = data["dst_input"]
+    for u, v, src_branch, dst_input in index["edges"]:
+        src_spec = specs[u]
+        dst_spec = specs[v]
         
         if src_branch not in src_spec.outputs:
             errors.append(f"Edge {u}->{v}: source branch '{src_branch}' not in {u}'s outputs")
@@ -48,55 +175,47 @@ def validate_graph(g: nx.MultiDiGraph, entry_bindings: dict[tuple[str, str], any
             errors.append(f"Edge {u}->{v}: type mismatch {src_type} -> {dst_type}")
     
     # Check input coverage
-    for node_id in g.nodes:
-        spec: NodeSpec = g.nodes[node_id]["spec"]
-        node_type = spec.node_type or spec.func.__name__
-        
+    in_adj = index["in_adj"]
+    for node_id, spec in specs.items():
         # Skip validation for triggers - they receive external input
-        if node_type in TRIGGER_TYPES:
+        if spec.effective_type in TRIGGER_TYPES:
             continue
         
-        incoming = {}
-        for u, v, data in g.in_edges(node_id, data=True):
-            inp = data["dst_input"]
-            incoming[inp] = incoming.get(inp, 0) + 1
-        
-        for input_name, input_def in spec.inputs.items():
-            edge_count = incoming.get(input_name, 0)
-            has_entry = (node_id, input_name) in entry_bindings
-            has_init = input_def.init is not None
-            has_default = input_def.default is not None
-            
-            if edge_count == 0 and not (has_entry or has_init or has_default):
-                errors.append(f"Node '{node_id}' input '{input_name}' has no source")
+        # Inputs with no edge, entry binding, init or default
+        missing = (
+            spec.inputs.keys()
+            - {inp for _, _, inp in in_adj[node_id]}
+            - entries_by_node.get(node_id, _NO_ENTRIES)
+            - spec.auto_covered_inputs
+        )
+        if missing:
+            # Report in declaration order
+            for input_name in spec.inputs:
+                if input_name in missing:
+                    errors.append(f"Node '{node_id}' input '{input_name}' has no source")
     
-    # Check cycles have init or entry
-    sccs = list(nx.strongly_connected_components(g))
-    for scc in sccs:
-        if len(scc) <= 1:
-            continue
-        
-        has_starter = False
-        for node_id in scc:
-            spec: NodeSpec = g.nodes[node_id]["spec"]
-            for input_name, input_def in spec.inputs.items():
-                if input_def.init is not None or (node_id, input_name) in entry_bindings:
-                    has_starter = True
-                    break
-            if has_starter:
-                break
-        
-        if not has_starter:
+    # Check cycles have init or entry - nothing to do for a DAG
+    succ = index["succ"]
+    if _is_acyclic(succ):
+        return errors
+    
+    nodes = index["nodes"]
+    has_starter = [
+        any(
+            input_def.init is not None or input_name in entries_by_node.get(node_id, _NO_ENTRIES)
+            for input_name, input_def in specs[node_id].inputs.items()
+        )
+        for node_id in nodes
+    ]
+    for component in _cycles(succ):
+        if not any(has_starter[i] for i in component):
+            scc = {nodes[i] for i in component}
             errors.append(f"Cycle {scc} has no init or entry binding to start it")
     
     return errors
 
 
-def get_downstream(g: nx.MultiDiGraph, node_id: str, branch: str) -> list[tuple[str, str]]:
-    """Get list of (target_node, target_input) for a given output branch."""
-    result = []
-    for u, v, data in g.out_edges(node_id, data=True):
-        if data["src_branch"] == branch:
-            result.append((v, data["dst_input"]))
-    return result
+def get_downstream(g: nx.DiGraph, node_id: str, branch: str) -> tuple[tuple[str, str], ...]:
+    """Get (target_node, target_input) pairs for a given output branch."""
+    return _edge_index(g)["out_adj_by_branch"].get(node_id, _EMPTY).get(branch, ())
 
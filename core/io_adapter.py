@@ -3,7 +3,17 @@ IO Adapter pattern for exported workflows.
 Implement input() and output() methods to connect workflows to any UI.
 """
 
-from typing import Any, Type
+from typing import Any, Callable, Type
+
+_TRUE = frozenset({'true', 'yes', '1', 'y'})
+
+
+def _to_bool(raw: str) -> bool:
+    return raw.lower() in _TRUE
+
+
+# Parse console text for a trigger's type hint; other types stay strings
+_COERCERS: dict[type, Callable[[str], Any]] = {int: int, float: float, bool: _to_bool}
 
 
 class DictIO:
@@ -29,13 +39,8 @@ class ConsoleIO:
         prompt = f"{name} ({type_hint.__name__}): "
         raw = input(prompt)
         
-        if type_hint == int:
-            return int(raw)
-        elif type_hint == float:
-            return float(raw)
-        elif type_hint == bool:
-            return raw.lower() in ('true', 'yes', '1', 'y')
-        return raw
+        coerce = _COERCERS.get(type_hint)
+        return coerce(raw) if coerce else raw
     
     async def output(self, name: str, value: Any) -> None:
         print(f"→ {name}: {value}")
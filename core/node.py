@@ -16,6 +16,7 @@ def node(
     node_type: str = "",
     interface_type: str = "",
     participants: list = None,
+    sync_mode: str = "inline",
 ):
     """
     Decorator to register an async generator as a node.
@@ -27,14 +28,21 @@ def node(
         @node(category="Math", outputs={"result": int})
         async def add(a: int, b: int):
             yield ("result", a + b)
+    
+    Plain functions returning {branch: value} that block (CPU work, sync
+    clients) can pass sync_mode="thread" to run off the event loop.
     """
     def decorator(func):
-        hints = get_type_hints(func) if hasattr(func, '__annotations__') else {}
-        sig = inspect.signature(func)
+        # Plain annotations are already the types; only resolve string
+        # (forward / postponed) annotations through typing
+        hints = getattr(func, '__annotations__', {})
+        if any(isinstance(v, str) for v in hints.values()):
+            hints = get_type_hints(func)
+        params = tuple(inspect.signature(func).parameters.items())
         
         # Build inputs from function signature
         inputs = {}
-        for name, param in sig.parameters.items():
+        for name, param in params:
             ptype = hints.get(name, Any)
             
             # Handle default values
@@ -66,6 +74,7 @@ def node(
             node_type=node_type or "",
             interface_type=interface_type,
             participants=parts,
+            sync_mode=sync_mode,
         )
         
         _registry.append(spec)
@@ -3,20 +3,30 @@ Server with dynamic input support.
 """
 
 import asyncio
+import gzip
+import hashlib
 import inspect
 import json
+import os
 import traceback
 import importlib
 import importlib.util
 import sys
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, Request, Response, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import tempfile
-import shutil
 
 from core.spec_models import NodeSpec, InputDef, OutputDef, EdgeSpec
 from core.graph_topology import build_graph
@@ -26,7 +36,36 @@ from core.node import get_all_nodes, clear_registry
 from core import storage
 from examples.example_graphs import EXAMPLES
 
-app = FastAPI()
+
+def json_dumps(obj, sort_keys: bool = False, default=None) -> bytes:
+    """Encode obj as compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # orjson rejects ints outside 64 bits (anywhere in obj); stdlib handles them
+            pass
+    return json.dumps(obj, sort_keys=sort_keys, default=default,
+                      separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def json_loads(data):
+    """Decode JSON text or bytes; raises json.JSONDecodeError (orjson's subclasses it)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with json_dumps (orjson when it is installed)."""
+    
+    def render(self, content) -> bytes:
+        return json_dumps(content)
+
+
+# Plain dict returns are encoded with json_dumps too
+app = FastAPI(default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,22 +74,50 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+
+def node_files(folder: str) -> list[tuple[str, str]]:
+    """(module stem, path) for each public .py file directly inside folder."""
+    try:
+        with os.scandir(folder) as entries:
+            return [
+                (entry.name[:-3], entry.path)
+                for entry in entries
+                if entry.name.endswith(".py") and not entry.name.startswith("_")
+                and entry.is_file(follow_symlinks=False)
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def folder_fingerprint(folder: str) -> tuple:
+    """(name, mtime, size) of every .py file in folder - changes when any of them is edited."""
+    files = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(".py"):
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        return ()
+    return tuple(sorted(files))
+
+
+# Fingerprint of nodes/ as of the last load_builtin_nodes()
+builtin_fingerprint: Optional[tuple] = None
 
 
 def load_builtin_nodes() -> list[NodeSpec]:
     """Load all builtin node modules from nodes/ folder."""
+    global builtin_fingerprint
     clear_registry()
-    
-    nodes_dir = Path("nodes")
-    if not nodes_dir.exists():
-        return []
+    builtin_fingerprint = folder_fingerprint("nodes")
     
     # Import each .py file in nodes/ folder (not subfolders)
-    for py_file in nodes_dir.glob("*.py"):
-        if py_file.name.startswith("_"):
-            continue
-        
-        module_name = f"nodes.{py_file.stem}"
+    for stem, _ in node_files("nodes"):
+        module_name = f"nodes.{stem}"
         
         # Remove from cache to allow reload
         if module_name in sys.modules:
@@ -64,57 +131,91 @@ def load_builtin_nodes() -> list[NodeSpec]:
     return get_all_nodes()
 
 
+# Uploaded module name -> (sha256 of its source, module, node specs it registered)
+_uploaded_modules: dict[str, tuple[bytes, object, list[NodeSpec]]] = {}
+
+
 def load_nodes_from_folder(folder_path: str) -> list[NodeSpec]:
     """Load node specs from Python files in a folder (for uploaded nodes)."""
     from core.node import _registry
     
+    modules = sys.modules
     nodes = []
-    folder = Path(folder_path)
-    if not folder.exists():
-        return nodes
-    
-    for py_file in folder.glob("*.py"):
-        if py_file.name.startswith("_"):
+    for stem, py_file in node_files(folder_path):
+        module_name = f"dynamic_nodes_{stem}"
+        
+        # Same file re-uploaded unchanged - reuse its module and specs
+        digest = hashlib.sha256(Path(py_file).read_bytes()).digest()
+        cached = _uploaded_modules.get(module_name)
+        if cached is not None and cached[0] == digest:
+            modules[module_name] = cached[1]
+            nodes.extend(cached[2])
             continue
         
-        module_name = f"dynamic_nodes_{py_file.stem}"
         spec = importlib.util.spec_from_file_location(module_name, py_file)
         if spec and spec.loader:
             module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
+            modules[module_name] = module
             
             # Track registry size before import
             before = len(_registry)
             spec.loader.exec_module(module)
-            after = len(_registry)
             
             # Get newly added nodes
-            if after > before:
-                nodes.extend(_registry[before:])
+            module_nodes = _registry[before:]
+            nodes.extend(module_nodes)
+            _uploaded_modules[module_name] = (digest, module, module_nodes)
     
     return nodes
 
 
-def build_node_info(specs: list[NodeSpec]) -> tuple[dict, list]:
-    """Build node type registry and info list from specs."""
+@lru_cache(maxsize=1024)
+def source_of(func) -> str:
+    """Source code of a node function, read once per function object."""
+    return inspect.getsource(func)
+
+
+# id(spec) -> (spec, node info, type info); holding the spec keeps its id from being reused
+_info_cache: dict[int, tuple[NodeSpec, dict, dict]] = {}
+
+
+def build_node_info(specs: list[NodeSpec]) -> tuple[dict, list, dict]:
+    """
+    Build node type registry, info list and per-type port type names from specs.
+    
+    Source code is not read here; node_info_json() adds it on first use.
+    Info for spec objects seen on a previous call (e.g. uploaded nodes kept
+    across a reload) is reused rather than rebuilt.
+    """
+    global _info_cache
     types = {node.name: node for node in specs}
     info = []
+    type_info = {}
+    live = {}
     for name, spec in types.items():
+        cached = _info_cache.get(id(spec))
+        if cached is not None and cached[0] is spec:
+            live[id(spec)] = cached
+            info.append(cached[1])
+            type_info[name] = cached[2]
+            continue
+        # Type names are read once and shared by /nodes and /export info
+        input_types = {}
         visible_inputs = {}
         for k, v in spec.inputs.items():
+            inp_type = input_types[k] = {"type": v.type.__name__}
             if v.init is None:
-                inp_info = {"type": v.type.__name__}
                 if v.default is not None:
-                    inp_info["default"] = v.default
-                visible_inputs[k] = inp_info
+                    visible_inputs[k] = {"type": inp_type["type"], "default": v.default}
+                else:
+                    visible_inputs[k] = inp_type
+        output_types = {k: {"type": v.type.__name__} for k, v in spec.outputs.items()}
         
-        code = inspect.getsource(spec.func)
         node_info = {
             "name": name,
             "category": spec.category,
             "inputs": visible_inputs,
-            "outputs": {k: {"type": v.type.__name__} for k, v in spec.outputs.items()},
-            "code": code,
+            "outputs": output_types,
         }
         # Add interface info if present
         if spec.interface_type:
@@ -123,32 +224,81 @@ def build_node_info(specs: list[NodeSpec]) -> tuple[dict, list]:
                 {"id": p.id, "name": p.name, "can_send": p.can_send, "can_receive": p.can_receive}
                 for p in spec.participants
             ]
+        node_type_info = {"inputs": input_types, "outputs": output_types}
+        live[id(spec)] = (spec, node_info, node_type_info)
         info.append(node_info)
-    return types, info
+        type_info[name] = node_type_info
+    # Forget specs that are gone so they can be freed
+    _info_cache = live
+    return types, info, type_info
 
 
 # Node type registry & info cache
 node_types: dict = {}
 NODE_INFO: list = []
+# NODE_INFO with source code, serialized for /nodes on first request
+NODE_INFO_JSON: Optional[bytes] = None
+NODE_INFO_GZ: Optional[bytes] = None
+NODE_TYPE_INFO: dict = {}  # input/output type names per node type, for /export
+
+
+def set_node_registry(specs: list[NodeSpec]):
+    """Rebuild the node registry and its cached JSON from specs."""
+    global node_types, NODE_INFO, NODE_INFO_JSON, NODE_INFO_GZ, NODE_TYPE_INFO, current_graph_key
+    node_types, NODE_INFO, NODE_TYPE_INFO = build_node_info(specs)
+    # Node types changed - a re-posted graph must be rebuilt
+    current_graph_key = None
+    NODE_INFO_JSON = NODE_INFO_GZ = None
+
+
+def node_info_json() -> tuple[bytes, bytes]:
+    """Return NODE_INFO as JSON (plain and gzipped), reading node sources once."""
+    global NODE_INFO_JSON, NODE_INFO_GZ
+    if NODE_INFO_JSON is None:
+        for info in NODE_INFO:
+            info["code"] = source_of(node_types[info["name"]].func)
+        NODE_INFO_JSON = json_dumps(NODE_INFO)
+        NODE_INFO_GZ = gzip.compress(NODE_INFO_JSON)
+    return NODE_INFO_JSON, NODE_INFO_GZ
+
+
+# Examples are static - serialize them once
+EXAMPLES_INDEX_JSON = json_dumps({key: {"name": val["name"]} for key, val in EXAMPLES.items()})
+EXAMPLE_JSON = {key: json_dumps(val) for key, val in EXAMPLES.items()}
+EXAMPLES_INDEX_GZ = gzip.compress(EXAMPLES_INDEX_JSON)
+EXAMPLE_GZ = {key: gzip.compress(body) for key, body in EXAMPLE_JSON.items()}
+EXAMPLE_NOT_FOUND_JSON = json_dumps({"error": "Example not found"})
+
+
+def json_response(request: Request, body: bytes, gzipped: bytes) -> Response:
+    """Return cached JSON, pre-compressed when the client accepts gzip."""
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(gzipped, media_type="application/json",
+                        headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return Response(body, media_type="application/json")
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize nodes on server startup."""
-    global node_types, NODE_INFO
-    nodes = load_builtin_nodes()
-    node_types, NODE_INFO = build_node_info(nodes)
+    """Initialize nodes and the trigger input queue on server startup."""
+    global input_queue
+    input_queue = asyncio.Queue()
+    set_node_registry(load_builtin_nodes())
     print(f"Loaded {len(NODE_INFO)} nodes")
 
 # Custom uploaded nodes
 custom_nodes: list[NodeSpec] = []
 custom_temp_dir: Optional[str] = None
+# Node loading runs in worker threads; one load at a time, as the registry is shared
+node_load_lock = asyncio.Lock()
 
 # Current graph state
 current_graph = None
+# Canonical JSON of the graph definition current_graph was built from
+current_graph_key: Optional[bytes] = None
 
 # Websocket clients
-websocket_clients: list[WebSocket] = []
+websocket_clients: set[WebSocket] = set()
 
 
 @dataclass
@@ -178,63 +328,87 @@ async def set_application(data: dict):
 
 
 @app.get("/nodes")
-async def get_nodes(application: Optional[str] = None):
+async def get_nodes(request: Request, application: Optional[str] = None):
     """Get all available nodes."""
-    return NODE_INFO
+    return json_response(request, *node_info_json())
 
 
 @app.post("/reload-nodes")
 async def reload_nodes():
     """Reload all builtin nodes."""
-    global node_types, NODE_INFO
-    nodes = load_builtin_nodes()
-    
-    # Add custom nodes if any
-    all_nodes = nodes + custom_nodes
-    node_types, NODE_INFO = build_node_info(all_nodes)
+    async with node_load_lock:
+        # Nothing in nodes/ changed since the last load - keep the registry
+        if builtin_fingerprint is not None and NODE_INFO:
+            if await asyncio.to_thread(folder_fingerprint, "nodes") == builtin_fingerprint:
+                return {"status": "ok", "count": len(NODE_INFO)}
+        
+        nodes = await asyncio.to_thread(load_builtin_nodes)
+        
+        # Add custom nodes if any
+        set_node_registry(nodes + custom_nodes)
     
     return {"status": "ok", "count": len(NODE_INFO)}
 
 
-@app.post("/upload-nodes")
-async def upload_nodes(files: list[UploadFile] = File(...)):
-    global custom_nodes, custom_temp_dir, node_types, NODE_INFO
-    
-    if custom_temp_dir and Path(custom_temp_dir).exists():
-        shutil.rmtree(custom_temp_dir)
-    
-    custom_temp_dir = tempfile.mkdtemp(prefix="nodes_")
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+
+def clear_custom_dir() -> Path:
+    """
+    Empty the uploaded-nodes folder, creating it on first use.
     
-    for file in files:
-        if file.filename and file.filename.endswith('.py'):
-            filename = Path(file.filename).name
-            if filename.startswith('_'):
-                continue
-            file_path = Path(custom_temp_dir) / filename
-            content = await file.read()
-            file_path.write_bytes(content)
+    The folder is kept for the life of the process; only its .py files
+    (and their dynamic modules) are removed.
+    """
+    global custom_temp_dir
+    if custom_temp_dir is None or not Path(custom_temp_dir).exists():
+        custom_temp_dir = tempfile.mkdtemp(prefix="nodes_")
+        return Path(custom_temp_dir)
     
-    custom_nodes = load_nodes_from_folder(custom_temp_dir)
+    folder = Path(custom_temp_dir)
+    for py_file in folder.glob("*.py"):
+        py_file.unlink()
+        sys.modules.pop(f"dynamic_nodes_{py_file.stem}", None)
+    return folder
+
+
+@app.post("/upload-nodes")
+async def upload_nodes(files: list[UploadFile] = File(...)):
+    global custom_nodes
     
-    builtin_nodes = load_builtin_nodes()
-    all_nodes = builtin_nodes + custom_nodes
-    node_types, NODE_INFO = build_node_info(all_nodes)
+    async with node_load_lock:
+        folder = await asyncio.to_thread(clear_custom_dir)
+        
+        for file in files:
+            if file.filename and file.filename.endswith('.py'):
+                filename = Path(file.filename).name
+                if filename.startswith('_'):
+                    continue
+                file_path = folder / filename
+                # Stream in chunks; disk writes run off the event loop
+                with open(file_path, "wb") as out:
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(out.write, chunk)
+        
+        custom_nodes = await asyncio.to_thread(load_nodes_from_folder, str(folder))
+        
+        builtin_nodes = await asyncio.to_thread(load_builtin_nodes)
+        set_node_registry(builtin_nodes + custom_nodes)
     
     return {"status": "ok", "loaded": len(custom_nodes)}
 
 
 @app.post("/clear-custom-nodes")
 async def clear_custom_nodes_endpoint():
-    global custom_nodes, custom_temp_dir, node_types, NODE_INFO
-    
-    custom_nodes = []
+    global custom_nodes
     
-    if custom_temp_dir and Path(custom_temp_dir).exists():
-        shutil.rmtree(custom_temp_dir)
-        custom_temp_dir = None
-    
-    builtin_nodes = load_builtin_nodes()
-    node_types, NODE_INFO = build_node_info(builtin_nodes)
+    async with node_load_lock:
+        custom_nodes = []
+        
+        if custom_temp_dir:
+            await asyncio.to_thread(clear_custom_dir)
+        
+        set_node_registry(await asyncio.to_thread(load_builtin_nodes))
     
     return {"status": "ok"}
 
@@ -249,9 +423,31 @@ async def get_graph():
         "globalVariables": {}
     }
 
+_edge_ends = itemgetter("source", "target")
+GRAPH_OK_JSON = json_dumps({"status": "ok", "errors": []})
+
+
+async def read_json_body(request: Request) -> dict:
+    """Decode a JSON object request body directly, skipping FastAPI's body validation."""
+    try:
+        body = json_loads(await request.body())
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    return body
+
+
 @app.post("/graph")
-async def save_graph(graph_def: dict):
-    global current_graph
+async def save_graph(request: Request):
+    global current_graph, current_graph_key
+    
+    graph_def = await read_json_body(request)
+
+    # The UI re-posts the same graph often; skip rebuilding it
+    graph_key = json_dumps(graph_def, sort_keys=True)
+    if current_graph is not None and graph_key == current_graph_key:
+        return Response(GRAPH_OK_JSON, media_type="application/json")
 
     instances = graph_def.get("instances", [])
     edges = graph_def.get("edges", [])
@@ -260,37 +456,38 @@ async def save_graph(graph_def: dict):
     instance_specs = []
     
     for inst in instances:
-        if inst["type"] == "subgraph":
+        type_name = inst["type"]
+        if type_name == "subgraph":
             continue
-            
-        if inst["type"] not in node_types:
-            return {"status": "error", "errors": [f"Unknown node type: {inst['type']}"]}
         
-        base_spec = node_types[inst["type"]]
+        base_spec = node_types.get(type_name)
+        if base_spec is None:
+            return FastJSONResponse({"status": "error", "errors": [f"Unknown node type: {type_name}"]})
         
-        # Handle instance-specific overrides
-        inputs = base_spec.inputs.copy()
-        defaults = inst.get("defaults", {})
-        global_bindings = inst.get("globalBindings", {})
+        # Handle instance-specific overrides (shared with the base spec
+        # unless a default is overridden below)
+        inputs = base_spec.inputs
+        defaults = inst.get("defaults") or {}
+        global_bindings = inst.get("globalBindings")
         
         # Resolve global bindings first (they take precedence)
-        for input_name, var_name in global_bindings.items():
-            if var_name in global_vars:
-                defaults[input_name] = global_vars[var_name]
+        if global_bindings:
+            for input_name, var_name in global_bindings.items():
+                if var_name in global_vars:
+                    defaults[input_name] = global_vars[var_name]
         
         # Create new InputDefs for overridden defaults
         if defaults:
-            new_inputs = {}
-            for name, input_def in inputs.items():
-                if name in defaults:
+            new_inputs = dict(inputs)
+            for name, value in defaults.items():
+                input_def = inputs.get(name)
+                if input_def is not None:
                     # Create copy with new default
                     new_inputs[name] = InputDef(
                         type=input_def.type,
                         init=input_def.init,
-                        default=defaults[name]
+                        default=value
                     )
-                else:
-                    new_inputs[name] = input_def
             inputs = new_inputs
 
         instance_spec = NodeSpec(
@@ -301,67 +498,134 @@ async def save_graph(graph_def: dict):
             outputs=base_spec.outputs,
             func=base_spec.func,
             interface_type=base_spec.interface_type,
-            participants=base_spec.participants
+            participants=base_spec.participants,
+            sync_mode=base_spec.sync_mode,
         )
         instance_specs.append(instance_spec)
     
     valid_node_ids = {s.name for s in instance_specs}
     
-    edge_specs = [
-        EdgeSpec(
-            source_node=e["source"],
-            source_branch=e["sourceHandle"],
-            target_node=e["target"],
-            target_input=e["targetHandle"]
-        ) for e in edges
-        if e["source"] in valid_node_ids and e["target"] in valid_node_ids
-    ]
+    edge_specs = []
+    for e in edges:
+        source, target = _edge_ends(e)
+        if source in valid_node_ids and target in valid_node_ids:
+            # Handles are only read for kept edges - edges into subgraphs may lack them
+            edge_specs.append(EdgeSpec(source, e["sourceHandle"], target, e["targetHandle"]))
     
     current_graph = build_graph(instance_specs, edge_specs)
+    current_graph_key = graph_key
     
-    return {"status": "ok", "errors": []}
+    return Response(GRAPH_OK_JSON, media_type="application/json")
 
 
-async def notify_clients(event_type: str, data: dict):
-    processed = {}
-    for k, v in data.items():
-        if isinstance(v, (list, dict)):
-            processed[k] = v
-        else:
-            processed[k] = str(v)
-    
-    msg = json.dumps({"type": event_type, "data": processed})
-    for ws in list(websocket_clients):
-        try:
-            await ws.send_text(msg)
-        except:
-            pass
+# Values sent to the browser unchanged; bools/None are still stringified so the
+# UI shows "True"/"None" as before rather than rendering nothing
+_WIRE_TYPES = frozenset({str, int, float, list, dict})
+
+
+def _event_message(event_type: str, data: dict) -> dict:
+    # Only rebuild the payload when something can't go out as-is; objects
+    # nested in lists/dicts fall back to str() in the encoder
+    if not all(type(v) in _WIRE_TYPES for v in data.values()):
+        data = {k: v if type(v) in _WIRE_TYPES or isinstance(v, (list, dict)) else str(v) for k, v in data.items()}
+    return {"type": event_type, "data": data}
+
 
+# Seconds a client may take to accept a frame before it is dropped
+SEND_TIMEOUT = 5.0
 
-input_queue: asyncio.Queue = None
+
+async def broadcast(message: dict):
+    """Send one JSON message to every connected client."""
+    if not websocket_clients:
+        return
+    # Text frames - the browser client JSON-parses event.data as a string
+    msg = json_dumps(message, default=str).decode()
+    clients = tuple(websocket_clients)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(ws.send_text(msg), SEND_TIMEOUT) for ws in clients),
+        return_exceptions=True,
+    )
+    # Drop clients whose send failed or stalled, and close them so the
+    # browser sees the connection end instead of silently missing events
+    dead = [ws for ws, result in zip(clients, results) if isinstance(result, Exception)]
+    if dead:
+        websocket_clients.difference_update(dead)
+        await asyncio.gather(*(close_quietly(ws) for ws in dead))
+
+
+async def close_quietly(ws: WebSocket):
+    """Close a websocket, ignoring errors from one that is already broken."""
+    try:
+        await ws.close()
+    except Exception:
+        pass
+
+
+async def notify_clients(event_type: str, data: dict):
+    # Nobody listening - don't build the message at all
+    if not websocket_clients:
+        return
+    await broadcast(_event_message(event_type, data))
+
+
+async def notify_events(events: list[tuple[str, dict]]):
+    """Executor observer - sends a batch of events to clients as one frame."""
+    if not websocket_clients:
+        return
+    if len(events) == 1:
+        await notify_clients(*events[0])
+        return
+    await broadcast({"type": "batch", "events": [_event_message(t, d) for t, d in events]})
+
+
+# Trigger inputs from websocket clients; created once at startup
+input_queue: Optional[asyncio.Queue] = None
+# Task running the current graph, cancelled when a new run starts
+current_run: Optional[asyncio.Task] = None
+
+
+def parse_input_value(value):
+    """Coerce trigger input to int when it looks numeric; otherwise pass it through."""
+    # Int triggers already arrive as JSON numbers from the run panel
+    if type(value) is int:
+        return value
+    if isinstance(value, str):
+        # Skip the int() attempt (and its exception) for plain text
+        digits = value.strip().lstrip("+-").replace("_", "")
+        if not digits.isdecimal():
+            return value
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return value
 
 
 async def input_handler():
     """Wait for any trigger input from websocket."""
-    global input_queue
-    if input_queue is None:
-        input_queue = asyncio.Queue()
     return await input_queue.get()
 
 
 @app.post("/run")
 async def run_graph():
     """Start graph execution - returns immediately, progress via websocket."""
-    global current_graph, input_queue
+    global current_graph, current_run
     
     if current_graph is None:
         return {"error": "No graph defined"}
     
-    input_queue = asyncio.Queue()
+    # Stop the previous run so its trigger pump doesn't take this run's inputs
+    if current_run is not None and not current_run.done():
+        current_run.cancel()
+        await asyncio.gather(current_run, return_exceptions=True)
+    
+    # Drop inputs left over from a previous run
+    while not input_queue.empty():
+        input_queue.get_nowait()
     
     async def run_task():
         await asyncio.sleep(0.1)
-        executor = Executor(current_graph, observers=[notify_clients], input_handler=input_handler)
+        executor = Executor(current_graph, observers=[notify_events], input_handler=input_handler)
         try:
             await executor.run()
             await notify_clients("run_complete", {})
@@ -369,66 +633,77 @@ async def run_graph():
             traceback.print_exc()
             await notify_clients("run_error", {"error": str(e)})
 
-    asyncio.create_task(run_task())
+    current_run = asyncio.create_task(run_task())
     
     return {"status": "started"}
 
 
 @app.post("/export")
-async def export_to_python(graph_def: dict):
+async def export_to_python(request: Request):
     """Export graph to standalone Python code."""
-    
-    node_type_info = {}
-    for name, spec in node_types.items():
-        node_type_info[name] = {
-            "inputs": {k: {"type": v.type.__name__} for k, v in spec.inputs.items()},
-            "outputs": {k: {"type": v.type.__name__} for k, v in spec.outputs.items()},
-        }
-    
+    graph_def = await read_json_body(request)
     instances = graph_def.get("instances", [])
     edges = graph_def.get("edges", [])
     
-    code = export_graph(instances, edges, node_type_info)
+    code = export_graph(instances, edges, NODE_TYPE_INFO)
     
-    return {"code": code}
+    return FastJSONResponse({"code": code})
 
 
 @app.websocket("/ws/events")
 async def websocket_events(websocket: WebSocket):
     await websocket.accept()
-    websocket_clients.append(websocket)
+    websocket_clients.add(websocket)
 
     try:
         while True:
             text = await websocket.receive_text()
             try:
-                msg = json.loads(text)
+                msg = json_loads(text)
                 if msg.get("type") == "input_response":
                     node_id = msg.get("node_id")
-                    value = msg.get("value")
-                    try:
-                        value = int(value)
-                    except (ValueError, TypeError):
-                        pass
-                    if input_queue:
-                        await input_queue.put((node_id, value))
+                    value = parse_input_value(msg.get("value"))
+                    input_queue.put_nowait((node_id, value))
                 elif msg.get("type") == "chat_message":
                     # Handle chat UI sending messages to chat nodes
                     chat_id = msg.get("chat_id")
                     message = msg.get("message")
-                    if chat_id and message and input_queue:
+                    if chat_id and message:
                         # Send to all chat nodes with this chat_id
-                        await input_queue.put((f"chat_{chat_id}", message))
+                        input_queue.put_nowait((f"chat_{chat_id}", message))
             except json.JSONDecodeError:
                 pass
     except WebSocketDisconnect:
-        websocket_clients.remove(websocket)
+        websocket_clients.discard(websocket)
+
+
+# source file -> (mtime_ns, size, content) as last read or written by rewrite_source
+_file_cache: dict[str, tuple[int, int, str]] = {}
+
+
+def rewrite_source(source_file: str, old_code: str, new_code: str):
+    """Replace old_code with new_code in source_file."""
+    # Reuse the contents from the last edit unless the file changed on disk since
+    stat = os.stat(source_file)
+    cached = _file_cache.get(source_file)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        content = cached[2]
+    else:
+        with open(source_file, 'r') as f:
+            content = f.read()
+    
+    new_content = content.replace(old_code, new_code)
+    
+    with open(source_file, 'w') as f:
+        f.write(new_content)
+    stat = os.stat(source_file)
+    _file_cache[source_file] = (stat.st_mtime_ns, stat.st_size, new_content)
 
 
 @app.post("/update-node-code")
 async def update_node_code(data: dict):
     """Update node code - rewrites the function in its source file."""
-    global node_types, NODE_INFO
+    global NODE_INFO_JSON, NODE_INFO_GZ
     
     node_name = data.get("node_name")
     new_code = data.get("code")
@@ -442,28 +717,26 @@ async def update_node_code(data: dict):
     except:
         return {"status": "error", "message": "Cannot find source file"}
     
-    with open(source_file, 'r') as f:
-        content = f.read()
-    
-    old_code = inspect.getsource(spec.func)
-    new_content = content.replace(old_code, new_code)
+    async with node_load_lock:
+        await asyncio.to_thread(rewrite_source, source_file, source_of(spec.func), new_code)
     
-    with open(source_file, 'w') as f:
-        f.write(new_content)
+    # The file changed under the cached sources
+    source_of.cache_clear()
+    NODE_INFO_JSON = NODE_INFO_GZ = None
     
     return {"status": "ok", "message": "Code updated, server will reload automatically"}
 
 
 @app.get("/examples")
-async def get_examples():
-    return {key: {"name": val["name"]} for key, val in EXAMPLES.items()}
+async def get_examples(request: Request):
+    return json_response(request, EXAMPLES_INDEX_JSON, EXAMPLES_INDEX_GZ)
 
 
 @app.get("/examples/{key}")
-async def get_example(key: str):
-    if key not in EXAMPLES:
-        return {"error": "Example not found"}
-    return EXAMPLES[key]
+async def get_example(key: str, request: Request):
+    if key not in EXAMPLE_JSON:
+        return Response(EXAMPLE_NOT_FOUND_JSON, media_type="application/json")
+    return json_response(request, EXAMPLE_JSON[key], EXAMPLE_GZ[key])
 
 
 if __name__ == "__main__":
@@ -2,19 +2,19 @@ from dataclasses import dataclass, field
 from typing import Any, Callable, Type
 
 
-@dataclass
+@dataclass(slots=True)
 class InputDef:
     type: Type
     init: Any = None
     default: Any = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OutputDef:
     type: Type
 
 
-@dataclass
+@dataclass(slots=True)
 class ParticipantDef:
     """A participant in an interface (e.g., User, Bot in chat)."""
     id: str
@@ -23,7 +23,7 @@ class ParticipantDef:
     can_receive: bool = True  # Has input capability (displays messages to them)
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeSpec:
     name: str
     inputs: dict[str, InputDef]
@@ -34,9 +34,21 @@ class NodeSpec:
     # Interface config for UI-backed nodes
     interface_type: str = ""  # "chat", "form", etc.
     participants: list = field(default_factory=list)
+    # Plain-function nodes: "inline" runs on the event loop, "thread" in a worker thread
+    sync_mode: str = "inline"
+    # node_type, falling back to the function name; resolved once
+    effective_type: str = field(init=False, repr=False)
+    # Inputs that never need an edge: they have an init or a default
+    auto_covered_inputs: frozenset = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.effective_type = self.node_type or self.func.__name__
+        self.auto_covered_inputs = frozenset(
+            name for name, d in self.inputs.items() if d.init is not None or d.default is not None
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class EdgeSpec:
     source_node: str
     source_branch: str
@@ -45,14 +57,14 @@ class EdgeSpec:
 
 
 # Canonical type constants
-TRIGGER_TYPES = {'terminal_input', 'trigger', 'chat_trigger', 'interface_chat', 
-                 'ui_chat_input', 'ui_chat_full', 'ui_text_input', 'ui_button'}
-OUTPUT_TYPES = {'terminal_output'}
-LOGGER_TYPES = {'logger'}
-INTERFACE_TYPES = {'interface_chat'}
+TRIGGER_TYPES = frozenset({'terminal_input', 'trigger', 'chat_trigger', 'interface_chat', 
+                           'ui_chat_input', 'ui_chat_full', 'ui_text_input', 'ui_button'})
+OUTPUT_TYPES = frozenset({'terminal_output'})
+LOGGER_TYPES = frozenset({'logger'})
+INTERFACE_TYPES = frozenset({'interface_chat'})
 
 # UI Component types - these render on the App canvas
-UI_COMPONENT_TYPES = {
+UI_COMPONENT_TYPES = frozenset({
     'ui_chat_input', 'ui_chat_display', 'ui_chat_full',
     'ui_text_input', 'ui_button', 'ui_text_display', 'ui_json_display'
-}
\ No newline at end of file
+})
\ No newline at end of file
@@ -2,48 +2,82 @@
 Mock Supabase storage - saves to a local JSON file.
 """
 
+import copy
 import json
 import os
+import threading
 
 STORAGE_FILE = "storage.json"
 
+# Data as last read or written, with the file's (mtime, size) at that point.
+# Reads reuse it until the file changes on disk (e.g. edited by hand).
+_cache = None
+_lock = threading.RLock()
 
-def _load_data():
-    if os.path.exists(STORAGE_FILE):
-        with open(STORAGE_FILE, "r") as f:
-            return json.load(f)
-    return {}
 
+def _file_key():
+    try:
+        stat = os.stat(STORAGE_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
 
-def _save_data(data):
-    with open(STORAGE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+
+# The cached dict itself - only used inside this module
+def _load_data():
+    global _cache
+    with _lock:
+        key = _file_key()
+        if _cache is None or _cache[0] != key:
+            data = {}
+            if key is not None:
+                with open(STORAGE_FILE, "r") as f:
+                    data = json.load(f)
+            _cache = (key, data)
+        return _cache[1]
 
 
-# Get a value by key
+def _save_data(data):
+    global _cache
+    with _lock:
+        try:
+            # Write to a temp file and swap it in, so readers never see half a file
+            tmp = f"{STORAGE_FILE}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, STORAGE_FILE)
+        except BaseException:
+            # Callers may have changed the cached dict already - reread next time
+            _cache = None
+            raise
+        _cache = (_file_key(), data)
+
+
+# Get a value by key (a copy - changing it doesn't change storage)
 def get(key):
-    data = _load_data()
-    return data.get(key)
+    return copy.deepcopy(_load_data().get(key))
 
 
 # Set a value by key
 def set(key, value):
-    data = _load_data()
-    data[key] = value
-    _save_data(data)
+    with _lock:
+        data = _load_data()
+        data[key] = copy.deepcopy(value)
+        _save_data(data)
 
 
 # Delete a key
 def delete(key):
-    data = _load_data()
-    if key in data:
-        del data[key]
-        _save_data(data)
+    with _lock:
+        data = _load_data()
+        if key in data:
+            del data[key]
+            _save_data(data)
 
 
 # Get all data
 def get_all():
-    return _load_data()
+    return copy.deepcopy(_load_data())
 
 
 # Clear all data
@@ -51,6 +85,16 @@ def clear():
     _save_data({})
 
 
+# Set data[key][name] with a single load and save
+def _set_nested(key, name, value):
+    with _lock:
+        data = _load_data()
+        section = data.get(key) or {}
+        section[name] = copy.deepcopy(value)
+        data[key] = section
+        _save_data(data)
+
+
 # ===== Specific helpers =====
 
 def get_api_key(name):
@@ -61,9 +105,7 @@ def get_api_key(name):
 
 def set_api_key(name, value):
     """Set an API key by name"""
-    keys = get("api_keys") or {}
-    keys[name] = value
-    set("api_keys", keys)
+    _set_nested("api_keys", name, value)
 
 
 def get_global_variables():
@@ -84,6 +126,4 @@ def get_setting(name):
 
 def set_setting(name, value):
     """Set a user setting"""
-    settings = get("settings") or {}
-    settings[name] = value
-    set("settings", settings)
+    _set_nested("settings", name, value)
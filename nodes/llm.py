@@ -8,6 +8,7 @@ from core.node import node
 @node(category="LLM", outputs={"response": str, "parsed": dict})
 async def gemini_chat(api_key: str = "YOUR_API_KEY", system_prompt: str = "You are a helpful assistant.", user_message: str = "", schema: str = ""):
     """Call Gemini API with structured output support."""
+    import asyncio
     import json
     from google import genai
     
@@ -21,7 +22,9 @@ async def gemini_chat(api_key: str = "YOUR_API_KEY", system_prompt: str = "You a
         config["response_mime_type"] = "application/json"
         config["response_json_schema"] = schema_dict
     
-    response = client.models.generate_content(
+    # The client call blocks; keep it off the event loop
+    response = await asyncio.to_thread(
+        client.models.generate_content,
         model="gemini-2.0-flash",
         contents=full_prompt,
         config=config if config else None
@@ -188,7 +188,19 @@ export function connectWebSocket(onMessage) {
     wsInstance.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data)
-        onMessage(data)
+        // Events produced together arrive in a single batch frame
+        if (data.type === 'batch') {
+          // One failing handler must not drop the rest of the batch
+          data.events.forEach(ev => {
+            try {
+              onMessage(ev)
+            } catch (e) {
+              console.error('WebSocket event handler failed', e)
+            }
+          })
+        } else {
+          onMessage(data)
+        }
       } catch (e) {
         console.error('Failed to parse WebSocket message', e)
       }